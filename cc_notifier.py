@@ -4,15 +4,30 @@ CC-notifier: Claude Code 事件通知器
 用于接收 Claude Code 的 hook 事件并发送到飞书和 iOS（通过 Bark）
 """
 import json
+import mmap
 import sys
 import os
-import requests
-import urllib.parse
-import re
+import threading
 from datetime import datetime
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+# 优先使用 orjson（C 实现，解析/序列化更快），未安装时回退到标准库 json
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> bytes:
+        """序列化为 UTF-8 编码的 JSON bytes"""
+        return orjson.dumps(obj)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> bytes:
+        """序列化为 UTF-8 编码的 JSON bytes"""
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
 
 def load_config() -> Dict[str, Any]:
     """
@@ -30,19 +45,23 @@ def load_config() -> Dict[str, Any]:
         "ios_push_enabled": False
     }
     
-    # 尝试从配置文件加载
-    config_paths = [
-        Path.home() / ".cc-notifier" / "config.json",  # 用户目录
-        Path(__file__).parent / "config.json",         # 脚本所在目录
-    ]
-    
-    for config_path in config_paths:
-        if config_path.exists():
+    # 环境变量已覆盖全部配置项时，配置文件不会生效，直接跳过文件读取
+    env_keys = ("FEISHU_WEBHOOK_URL", "IOS_PUSH_URL", "IOS_PUSH_ENABLED")
+    if not all(os.environ.get(key) for key in env_keys):
+        # 尝试从配置文件加载
+        config_paths = [
+            Path.home() / ".cc-notifier" / "config.json",  # 用户目录
+            Path(__file__).parent / "config.json",         # 脚本所在目录
+        ]
+        
+        for config_path in config_paths:
             try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    file_config = json.load(f)
+                with open(config_path, 'rb') as f:
+                    file_config = _loads(f.read())
                     config.update(file_config)
                     break
+            except FileNotFoundError:
+                continue
             except Exception as e:
                 print(f"警告：无法加载配置文件 {config_path}: {e}", file=sys.stderr)
     
@@ -63,6 +82,102 @@ WEBHOOK_URL = CONFIG["feishu_webhook_url"]
 IOS_PUSH_URL = CONFIG["ios_push_url"]
 IOS_PUSH_ENABLED = CONFIG["ios_push_enabled"]
 
+# 调试输出开关：设置 CC_NOTIFIER_DEBUG=1 时才向 stderr 输出 [DEBUG] 信息
+_DEBUG = os.environ.get("CC_NOTIFIER_DEBUG") == "1"
+
+# 飞书和 Bark 共用的 HTTP 客户端（连接池 + keep-alive），首次发送时才创建
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _create_session():
+    """
+    创建 HTTP 客户端
+    
+    安装了 httpx[http2] 时使用 HTTP/2（多路复用、头部压缩），否则使用 requests（连接失败时重试一次）
+    两种客户端都会读取 HTTPS_PROXY/HTTP_PROXY/NO_PROXY 等代理环境变量
+    HTTP 库在这里才导入：被忽略的事件不发送请求，无需承担导入开销
+    
+    返回：(client, is_httpx)
+    """
+    try:
+        import httpx
+        
+        # 不传入自定义 transport：httpx 只在 transport 为空时才读取代理环境变量
+        # 未安装 h2 时 http2=True 会抛出 ImportError，回退到 requests
+        client = httpx.Client(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4)
+        )
+        return client, True
+    except ImportError:
+        pass
+    
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=4,
+        max_retries=Retry(total=1, backoff_factor=0.2)
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session, False
+
+
+def _post_json(url: str, payload: Dict[str, Any]):
+    """
+    以 JSON 请求体发送 POST 请求，飞书和 Bark 共用
+    
+    payload 预先序列化，跳过 HTTP 库内部的 json 编码
+    返回：HTTP 响应（httpx 和 requests 的响应接口在这里的用法一致）
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = _create_session()
+    client, is_httpx = _SESSION
+    
+    body = _dumps(payload)
+    headers = {"Content-Type": "application/json; charset=utf-8"}
+    if is_httpx:
+        return client.post(url, content=body, headers=headers)
+    return client.post(url, data=body, headers=headers, timeout=10)
+
+
+# iOS 推送标题中需要清理的 emoji（预先构建的删除表，str.translate 单次遍历即可清理）
+_EMOJI_TRANS = str.maketrans('', '', '🚨⏸️❌✅🤖🔧📢🛑🚀📝⚠️ℹ️')
+
+# 错误关键词列表（小写，与转为小写的消息比较）
+_ERROR_KWS = (
+    "api error:",
+)
+
+# 可能包含 cwd 信息的字段，按优先级排列
+_CWD_KEYS = ("cwd", "workspace", "workingDirectory")
+
+# 解析前的字节级预筛选：不包含这些片段的行不可能提供所需字段，直接跳过，无需 JSON 解析
+_TEXT_MARKER = b'"text"'
+_CWD_MARKERS = tuple(f'"{key}"'.encode() for key in _CWD_KEYS)
+
+
+def _iter_line_spans_reversed(mm: mmap.mmap):
+    """
+    从文件末尾开始倒序产出每一行的 (start, end) 位置
+
+    用 rfind 直接在内存映射上定位换行，只返回位置不复制数据，
+    由调用方决定哪些行需要切片解析
+    """
+    end = len(mm)
+    while end > 0:
+        start = mm.rfind(b"\n", 0, end) + 1
+        yield start, end
+        end = start - 1
+
 
 def extract_last_message_from_jsonl(transcript_path: str) -> tuple[str, str]:
     """
@@ -70,69 +185,74 @@ def extract_last_message_from_jsonl(transcript_path: str) -> tuple[str, str]:
     
     JSONL 文件格式：每行一个 JSON 对象，包含对话记录
     我们要找的是最后一个包含 message.content[].text 的条目
+    对话记录会不断增长，因此从文件末尾倒序查找，找到即停止
     
     返回: (last_message_text, cwd)
     """
     try:
         # 展开路径（支持 ~ 等）
         expanded_path = os.path.expanduser(transcript_path)
-        if not os.path.exists(expanded_path):
-            print(f"[DEBUG] JSONL 文件不存在: {expanded_path}", file=sys.stderr)
+        try:
+            size = os.stat(expanded_path).st_size
+        except FileNotFoundError:
+            if _DEBUG:
+                print(f"[DEBUG] JSONL 文件不存在: {expanded_path}", file=sys.stderr)
             return "", ""
         
         last_message_text = ""
         cwd = ""
-        line_count = 0
-        message_count = 0
         
-        # 逐行读取 JSONL 文件
-        with open(expanded_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
+        # 空文件无法建立内存映射，也不可能包含消息
+        if size == 0:
+            return "", ""
+        
+        # 内存映射 JSONL 文件后倒序查找，只有需要解析的行才切片复制
+        with open(expanded_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start, end in _iter_line_spans_reversed(mm):
+                # 只解析可能包含仍未找到的字段的行（同时跳过空行）
+                if not ((not last_message_text and mm.find(_TEXT_MARKER, start, end) != -1)
+                        or (not cwd and any(mm.find(marker, start, end) != -1 for marker in _CWD_MARKERS))):
                     continue
                 
-                line_count += 1
-                
                 try:
                     # 解析每一行的 JSON
-                    data = json.loads(line)
-                    
-                    # 尝试提取 cwd 信息（可能在不同位置）
-                    if 'cwd' in data:
-                        cwd = data.get('cwd', '')
-                    elif 'workspace' in data:
-                        cwd = data.get('workspace', '')
-                    elif 'workingDirectory' in data:
-                        cwd = data.get('workingDirectory', '')
-                    elif isinstance(data.get('message'), dict) and 'cwd' in data['message']:
-                        cwd = data['message'].get('cwd', '')
-                    
-                    # 检查是否包含 message 字段
-                    if 'message' not in data or not isinstance(data['message'], dict):
-                        continue
-                    
-                    message = data['message']
-                    
-                    # 检查是否包含 content 数组
-                    if 'content' not in message or not isinstance(message['content'], list):
-                        continue
-                    
-                    # 遍历 content 数组，查找 text 类型的内容
-                    for content_item in message['content']:
+                    data = _loads(mm[start:end])
+                except ValueError as e:
+                    # 记录解析错误
+                    if _DEBUG:
+                        print(f"[DEBUG] JSON 解析错误: {e}", file=sys.stderr)
+                    continue
+                
+                if not isinstance(data, dict):
+                    continue
+                
+                # message 字段只取一次，后续 cwd 和 content 都从这里读取
+                message = data.get('message')
+                if not isinstance(message, dict):
+                    message = {}
+                
+                # 尝试提取 cwd 信息（可能在不同位置），倒序读取时第一个找到的即为最新值
+                if not cwd:
+                    cwd = next((data[key] for key in _CWD_KEYS if data.get(key)), "") or message.get('cwd', '')
+                
+                # 检查是否包含 content 数组（已找到消息时跳过）
+                content = message.get('content')
+                if not last_message_text and isinstance(content, list):
+                    # 倒序遍历 content 数组，取该条目中最后一个 text 类型的内容
+                    for content_item in reversed(content):
                         if isinstance(content_item, dict) and content_item.get('type') == 'text':
                             text = content_item.get('text', '')
                             if text:
-                                # 更新最后的消息文本（因为是顺序读取，最后的会覆盖之前的）
                                 last_message_text = text
-                                message_count += 1
-                                
-                except json.JSONDecodeError as e:
-                    # 记录解析错误
-                    print(f"[DEBUG] JSON 解析错误在第 {line_count} 行: {e}", file=sys.stderr)
-                    continue
+                                break
+                
+                # 消息和 cwd 都已找到，无需继续向前读取
+                if last_message_text and cwd:
+                    break
         
-        print(f"[DEBUG] 读取完成: 总行数={line_count}, 消息数={message_count}, cwd={cwd}", file=sys.stderr)
+        if _DEBUG:
+            print(f"[DEBUG] 读取完成: cwd={cwd}", file=sys.stderr)
         return last_message_text, cwd
         
     except Exception as e:
@@ -140,68 +260,103 @@ def extract_last_message_from_jsonl(transcript_path: str) -> tuple[str, str]:
         return "", ""
 
 
-def format_stop_message(data: Dict[str, Any]) -> Dict[str, Any]:
+def _markdown_element(content: str) -> Dict[str, Any]:
+    """
+    构建飞书卡片中的 markdown 元素
+    """
+    return {
+        "tag": "markdown",
+        "content": content,
+        "text_align": "left",
+        "text_size": "normal",
+        "margin": "0px 0px 0px 0px"
+    }
+
+
+def _build_card(title: str, elements: list[Dict[str, Any]], template: Optional[str] = None) -> Dict[str, Any]:
+    """
+    构建飞书卡片 2.0 消息
+
+    卡片结构固定，只需填入标题、body 元素和可选的主题色
+    """
+    header = {
+        "title": {
+            "tag": "plain_text",
+            "content": title
+        },
+        "padding": "12px 12px 12px 12px"
+    }
+    if template:
+        header["template"] = template  # 主题色
+    
+    return {
+        "msg_type": "interactive",
+        "card": {
+            "schema": "2.0",  # 声明使用卡片 2.0
+            "header": header,
+            "body": {
+                "direction": "vertical",
+                "padding": "12px 12px 12px 12px",
+                "elements": elements
+            }
+        }
+    }
+
+
+def format_stop_message(data: Dict[str, Any], last_message: str = "", cwd: str = "") -> Dict[str, Any]:
     """
     格式化 Stop 事件为飞书卡片消息（使用卡片 2.0 格式）
     
     Stop 事件在 Claude Code 会话结束时触发
     包含 transcript_path 指向对话记录文件
+    last_message 和 cwd 由调用方从对话记录中提取后传入
     """
     session_id = data.get("session_id", "Unknown Session")
     stop_hook_active = data.get("stop_hook_active", False)
     transcript_path = data.get("transcript_path", "")
     
-    # 从对话记录中提取最后的消息和 cwd 信息
-    last_message = ""
-    cwd = ""
-    if transcript_path:
-        last_message, cwd = extract_last_message_from_jsonl(transcript_path)
-    
-    # 错误关键词列表
-    error_keywords = [
-        "API Error:",
-    ]
-    
     # 检查是否包含错误关键词
     is_error = False
     if last_message:
         lower_msg = last_message.lower()
-        for kw in error_keywords:
-            if kw in lower_msg:
-                is_error = True
-                break
+        is_error = any(kw in lower_msg for kw in _ERROR_KWS)
     
-    # 构建 markdown 内容
-    content = ""
+    # 构建 markdown 内容：各段落先收集到列表中，最后一次性拼接
+    parts = []
     
     # 如果 stop hook 仍在激活状态，添加警告
     if stop_hook_active:
-        content += "**⚠️ 警告:** Stop hook 仍在激活状态\n\n"
+        parts.append("**⚠️ 警告:** Stop hook 仍在激活状态")
     
     # 显示实际内容
     if last_message:
         # 长消息截断，避免飞书消息过长
         if len(last_message) > 1000:
-            content += last_message[:1000] + "...\n\n*💡 完整内容请查看终端*"
+            parts.append(last_message[:1000] + "...\n\n*💡 完整内容请查看终端*")
         else:
-            content += last_message
+            parts.append(last_message)
     else:
         # 没有提取到消息时的后备显示
-        content += f"Session {session_id[:8]}... 已结束\n\n"
+        parts.append(f"Session {session_id[:8]}... 已结束")
         # 添加调试信息：显示 JSONL 文件路径
         if transcript_path:
-            content += f"**📁 Debug - JSONL路径:**\n`{transcript_path}`"
+            parts.append(f"**📁 Debug - JSONL路径:**\n`{transcript_path}`")
         else:
-            content += "**⚠️ Debug:** 未提供 transcript_path"
+            parts.append("**⚠️ Debug:** 未提供 transcript_path")
+    
+    content = "\n\n".join(parts)
     
     # 添加项目信息（cwd）
     if cwd:
         # 获取项目名称（目录名）
         project_name = os.path.basename(cwd.rstrip('/'))
         if project_name:
-            content = f"<font size=2>📂 项目: {project_name}</font>\n" + content
+            content = f"<font size=2>📂 项目: {project_name}</font>\n{content}"
         else:
-            content = f"<font size=2>📂 路径: {cwd}</font>\n" + content
+            content = f"<font size=2>📂 路径: {cwd}</font>\n{content}"
+    
+    # 消息本身可能带首尾空白，与拼接前的行为保持一致，只在最后去除一次
+    content = content.strip()
     
     # 根据是否错误调整卡片样式
     if is_error:
@@ -212,31 +367,7 @@ def format_stop_message(data: Dict[str, Any]) -> Dict[str, Any]:
         card_template = "green"
     
     # 返回飞书卡片 2.0 格式
-    return {
-        "msg_type": "interactive",
-        "card": {
-            "schema": "2.0",  # 声明使用卡片 2.0
-            "header": {
-                "title": {
-                    "tag": "plain_text",
-                    "content": card_title
-                },
-                "template": card_template,  # 主题色
-                "padding": "12px 12px 12px 12px"
-            },
-            "body": {
-                "direction": "vertical",
-                "padding": "12px 12px 12px 12px",
-                "elements": [{
-                    "tag": "markdown",
-                    "content": content.strip(),
-                    "text_align": "left",
-                    "text_size": "normal",
-                    "margin": "0px 0px 0px 0px"
-                }]
-            }
-        }
-    }
+    return _build_card(card_title, [_markdown_element(content)], card_template)
 
 
 def format_notification_message(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -267,30 +398,30 @@ def format_notification_message(data: Dict[str, Any]) -> Dict[str, Any]:
         content = f"Session: {session_id[:8]}..."
     
     # 返回飞书卡片 2.0 格式
-    return {
-        "msg_type": "interactive",
-        "card": {
-            "schema": "2.0",  # 声明使用卡片 2.0
-            "header": {
-                "title": {
-                    "tag": "plain_text",
-                    "content": "📢 Claude Code 通知"
-                },
-                "padding": "12px 12px 12px 12px"
-            },
-            "body": {
-                "direction": "vertical",
-                "padding": "12px 12px 12px 12px",
-                "elements": [{
-                    "tag": "markdown",
-                    "content": content.strip(),
-                    "text_align": "left",
-                    "text_size": "normal",
-                    "margin": "0px 0px 0px 0px"
-                }]
-            }
-        }
-    }
+    return _build_card("📢 Claude Code 通知", [_markdown_element(content.strip())])
+
+
+def merge_messages(messages: list[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    把多条飞书卡片消息合并为一条，用于 daemon 批量发送
+    
+    每条原消息的标题作为小标题，消息之间用分割线隔开
+    任意一条为异常（红色）时，合并后的卡片也显示为红色
+    """
+    if len(messages) == 1:
+        return messages[0]
+    
+    elements = []
+    is_error = False
+    for message in messages:
+        card = message["card"]
+        if elements:
+            elements.append({"tag": "hr"})
+        elements.append(_markdown_element(f"**{card['header']['title']['content']}**"))
+        elements.extend(card["body"]["elements"])
+        is_error = is_error or card["header"].get("template") == "red"
+    
+    return _build_card(f"📦 {len(messages)} 条 Claude Code 通知", elements, "red" if is_error else "green")
 
 
 def send_ios_push_notification(title: str, message: str) -> None:
@@ -298,47 +429,41 @@ def send_ios_push_notification(title: str, message: str) -> None:
     发送 iOS 推送通知（通过 Bark）
     
     Bark 是一个 iOS 推送服务，支持通过简单的 HTTP 请求发送通知
+    这里使用 POST JSON 的方式：POST {base_url}/{key}，请求体包含 title/body 等字段
     """
     if not IOS_PUSH_ENABLED or not IOS_PUSH_URL:
         return
     
     try:
         # 清理标题中的 emoji，避免重复
-        clean_title = re.sub(r'[🚨⏸️❌✅🤖🔧📢🛑🚀📝⚠️ℹ️]', '', title).strip()
+        clean_title = title.translate(_EMOJI_TRANS).strip()
         
         # 格式化标题和消息
         formatted_title = f"🤖 {clean_title}"
         formatted_message = f"{message}\n\n{datetime.now().strftime('%H:%M:%S')}"
         
-        # URL 编码
-        encoded_title = urllib.parse.quote(formatted_title)
-        encoded_message = urllib.parse.quote(formatted_message)
-        
         # 构建 Bark URL
         if IOS_PUSH_URL.startswith('http'):
             # 完整的 URL
-            base_url = IOS_PUSH_URL.rstrip('/')
-            url = f"{base_url}/{encoded_title}/{encoded_message}"
+            url = IOS_PUSH_URL.rstrip('/')
         else:
             # 只提供了 key，构建完整 URL
-            url = f"https://api.day.app/{IOS_PUSH_URL}/{encoded_title}/{encoded_message}"
+            url = f"https://api.day.app/{IOS_PUSH_URL}"
         
-        # 添加参数
-        params = {
+        # 推送内容放在 JSON 请求体中，无需 URL 编码
+        payload = {
+            "title": formatted_title,
+            "body": formatted_message,
             "sound": "default",     # 默认提示音
             "group": "ClaudeCode"   # 通知分组
         }
         
         # 发送请求
-        response = requests.get(url, params=params, timeout=10)
+        response = _post_json(url, payload)
         
-        # 检查响应
+        # 检查响应：Bark 出错时 HTTP 状态码即非 200，成功时无需解析响应体
         if response.status_code != 200:
             print(f"iOS 推送失败：{response.text}", file=sys.stderr)
-        else:
-            result = response.json()
-            if result.get('code') != 200:
-                print(f"iOS 推送失败：{result.get('message', '未知错误')}", file=sys.stderr)
                 
     except Exception as e:
         print(f"iOS 推送异常：{e}", file=sys.stderr)
@@ -355,7 +480,7 @@ def send_to_feishu(message: Dict[str, Any]) -> bool:
         return False
         
     try:
-        response = requests.post(WEBHOOK_URL, json=message, timeout=10)
+        response = _post_json(WEBHOOK_URL, message)
         response.raise_for_status()
         return True
     except Exception as e:
@@ -363,65 +488,112 @@ def send_to_feishu(message: Dict[str, Any]) -> bool:
         return False
 
 
-def main():
+def _handle_stop(hook_data: Dict[str, Any]) -> tuple[Dict[str, Any], tuple[str, str]]:
+    """
+    处理会话结束事件：只读取一次对话记录，飞书和 iOS 通知共用结果
+    
+    返回：(飞书消息, (iOS 推送标题, iOS 推送内容))
+    """
+    last_message = ""
+    cwd = ""
+    transcript_path = hook_data.get("transcript_path", "")
+    if transcript_path:
+        last_message, cwd = extract_last_message_from_jsonl(transcript_path)
+    
+    message = format_stop_message(hook_data, last_message, cwd)
+    
+    # iOS 通知：有消息内容时发送前100字符
+    if last_message:
+        return message, ("任务完成", last_message[:100])
+    return message, ("任务完成", "Session 已结束")
+
+
+def _handle_notification(hook_data: Dict[str, Any]) -> tuple[Dict[str, Any], tuple[str, str]]:
+    """
+    处理通知事件
+    
+    返回：(飞书消息, (iOS 推送标题, iOS 推送内容))
+    """
+    return format_notification_message(hook_data), ("Claude Code 通知", "收到新通知")
+
+
+# 事件类型 -> 处理函数，不在表中的事件类型（如 ToolUse 等）直接忽略
+HANDLERS = {
+    "Stop": _handle_stop,
+    # FIXME: 暂时关闭 Notification 事件，减少打扰
+    # "Notification": _handle_notification,
+}
+
+
+def get_event_type(hook_data: Dict[str, Any]) -> str:
+    """
+    获取 hook 数据的事件类型，没有明确的事件类型时从数据结构推断
+    """
+    event_type = hook_data.get("event_type", "Unknown")
+    
+    if event_type == "Unknown":
+        if "stop_hook_active" in hook_data:
+            event_type = "Stop"
+        elif "notification" in hook_data or "message" in hook_data:
+            event_type = "Notification"
+    
+    return event_type
+
+
+def send_notifications(message: Dict[str, Any], ios_push: tuple[str, str]) -> Dict[str, Any]:
+    """
+    发送飞书消息和 iOS 推送
+    
+    返回：发送结果，{"success": bool, ...}
+    """
+    # 并发发送到飞书和 iOS：两者互不依赖，总耗时取决于较慢的一方
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        executor.submit(send_ios_push_notification, *ios_push)
+        feishu_ok = executor.submit(send_to_feishu, message).result()
+    
+    if feishu_ok:
+        return {"success": True}
+    return {
+        "success": False, 
+        "error": "发送到飞书失败"
+    }
+
+
+def handle_hook_data(hook_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    处理一条 hook 数据并发送通知
+
+    返回：处理结果，{"success": bool, ...}
+    """
+    event_type = get_event_type(hook_data)
+    
+    handler = HANDLERS.get(event_type)
+    if handler is None:
+        # 忽略其他事件类型，不加载任何发送相关的模块
+        return {
+            "success": True, 
+            "message": f"忽略事件类型：{event_type}"
+        }
+    
+    return send_notifications(*handler(hook_data))
+
+
+def main(raw_data: Optional[bytes] = None):
     """
     主函数：从标准输入读取 hook 数据，处理并发送通知
+
+    raw_data: 已读取的 hook 数据（daemon 客户端回退时传入），为空时从标准输入读取
     """
     try:
         # 从标准输入读取 hook 数据
-        hook_data = json.load(sys.stdin)
-        
-        # 获取事件类型
-        event_type = hook_data.get("event_type", "Unknown")
-        
-        # 如果没有明确的事件类型，尝试从数据结构推断
-        if event_type == "Unknown":
-            if "stop_hook_active" in hook_data:
-                event_type = "Stop"
-            elif "notification" in hook_data or "message" in hook_data:
-                event_type = "Notification"
-        
-        # 处理不同的事件类型
-        if event_type == "Stop":
-            # 处理会话结束事件
-            message = format_stop_message(hook_data)
-            
-            # 发送 iOS 通知
-            transcript_path = hook_data.get("transcript_path", "")
-            if transcript_path:
-                last_message, _ = extract_last_message_from_jsonl(transcript_path)
-                if last_message:
-                    # 有消息内容，发送前100字符
-                    send_ios_push_notification("任务完成", last_message[:100])
-                else:
-                    send_ios_push_notification("任务完成", "Session 已结束")
-            else:
-                send_ios_push_notification("任务完成", "Session 已结束")
-                
-        # FIXME: 暂时关闭 iOS 通知，减少打扰
-        # elif event_type == "Notification":
-        #     # 处理通知事件
-        #     message = format_notification_message(hook_data)
-        #     send_ios_push_notification("Claude Code 通知", "收到新通知")
-            
-        else:
-            # 忽略其他事件类型（如 ToolUse 等）
-            print(json.dumps({
-                "success": True, 
-                "message": f"忽略事件类型：{event_type}"
-            }))
-            sys.exit(0)
+        if raw_data is None:
+            raw_data = sys.stdin.buffer.read()
+        hook_data = _loads(raw_data)
         
-        # 发送到飞书
-        if send_to_feishu(message):
-            print(json.dumps({"success": True}))
-            sys.exit(0)
-        else:
-            print(json.dumps({
-                "success": False, 
-                "error": "发送到飞书失败"
-            }))
-            sys.exit(1)
+        result = handle_hook_data(hook_data)
+        print(json.dumps(result))
+        sys.exit(0 if result["success"] else 1)
             
     except Exception as e:
         # 全局异常处理
@@ -433,4 +605,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
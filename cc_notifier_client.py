@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+CC-notifier 客户端：把 hook 数据转发给后台 daemon（cc_notifier_daemon.py）
+只依赖标准库且不加载配置，启动开销极小；daemon 未运行时回退为直接处理
+"""
+import os
+import socket
+import sys
+from pathlib import Path
+
+
+def get_socket_path() -> str:
+    """
+    获取 daemon 监听的 Unix socket 路径
+    
+    优先级：CC_NOTIFIER_SOCKET 环境变量 > $XDG_RUNTIME_DIR/cc-notifier.sock > ~/.cc-notifier/cc-notifier.sock
+    """
+    if env_path := os.environ.get("CC_NOTIFIER_SOCKET"):
+        return env_path
+    if runtime_dir := os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(runtime_dir, "cc-notifier.sock")
+    return str(Path.home() / ".cc-notifier" / "cc-notifier.sock")
+
+
+def main():
+    """
+    主函数：从标准输入读取 hook 数据，以一行一个 JSON 的格式发送给 daemon
+    """
+    raw_data = sys.stdin.buffer.read()
+    
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(get_socket_path())
+            # JSON 字符串内的换行必然已转义，替换掉结构中的换行即可保证整条数据占一行
+            sock.sendall(raw_data.replace(b"\n", b" ") + b"\n")
+    except OSError:
+        # daemon 未运行，直接在当前进程中处理
+        import cc_notifier
+        cc_notifier.main(raw_data)
+        return
+    
+    print('{"success": true, "message": "已提交到 daemon"}')
+
+
+if __name__ == "__main__":
+    main()
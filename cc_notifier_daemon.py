@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+CC-notifier daemon: 常驻后台，通过 Unix socket 接收 hook 数据并发送通知
+
+配置和 requests 只加载一次，到飞书/Bark 的 keep-alive 连接在多次 hook 之间复用
+hook 命令改为运行 cc_notifier_client.py，只负责把数据写入 socket
+
+批量发送：短时间内连续到达的多条通知（如脚本化会话中连续的 Stop 事件）
+会在 CC_NOTIFIER_BATCH_MS 毫秒（默认 150，0 表示不合并）内合并为一条飞书消息和一条 iOS 推送
+"""
+import os
+import queue
+import signal
+import socketserver
+import sys
+import threading
+import time
+
+import cc_notifier
+from cc_notifier_client import get_socket_path
+
+# 批量发送的等待窗口（毫秒）和每批最多合并的通知条数
+BATCH_WINDOW_MS = int(os.environ.get("CC_NOTIFIER_BATCH_MS", "150"))
+BATCH_MAX_SIZE = 10
+
+# 待发送的通知：(飞书消息, (iOS 推送标题, iOS 推送内容))
+_pending = queue.Queue()
+
+
+def _merge_ios_pushes(ios_pushes: list[tuple[str, str]]) -> tuple[str, str]:
+    """
+    把多条 iOS 推送合并为一条：标题相同时沿用，内容逐条换行拼接
+    """
+    titles = {title for title, _ in ios_pushes}
+    title = titles.pop() if len(titles) == 1 else "Claude Code 通知"
+    return title, "\n\n".join(body for _, body in ios_pushes)
+
+
+def _batch_worker():
+    """
+    发送线程：取出第一条通知后，在等待窗口内继续收集，合并后一次发送
+    """
+    while True:
+        batch = [_pending.get()]
+        deadline = time.monotonic() + BATCH_WINDOW_MS / 1000
+        while len(batch) < BATCH_MAX_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(_pending.get(timeout=timeout))
+            except queue.Empty:
+                break
+        
+        try:
+            message = cc_notifier.merge_messages([message for message, _ in batch])
+            ios_push = _merge_ios_pushes([ios_push for _, ios_push in batch])
+            result = cc_notifier.send_notifications(message, ios_push)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        
+        if not result["success"]:
+            print(f"发送通知失败：{result.get('error', '未知错误')}", file=sys.stderr)
+
+
+class HookRequestHandler(socketserver.StreamRequestHandler):
+    """
+    处理一个客户端连接：每行一个 JSON 格式的 hook 数据
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            if line.isspace():
+                continue
+            
+            try:
+                hook_data = cc_notifier._loads(line)
+                handler = cc_notifier.HANDLERS.get(cc_notifier.get_event_type(hook_data))
+                if handler is None:
+                    # 忽略其他事件类型（如 ToolUse 等）
+                    continue
+                notification = handler(hook_data)
+            except Exception as e:
+                print(f"处理 hook 数据失败：{e}", file=sys.stderr)
+                continue
+            
+            if BATCH_WINDOW_MS > 0:
+                _pending.put(notification)
+            else:
+                result = cc_notifier.send_notifications(*notification)
+                if not result["success"]:
+                    print(f"发送通知失败：{result.get('error', '未知错误')}", file=sys.stderr)
+
+
+class HookServer(socketserver.ThreadingUnixStreamServer):
+    """每个连接一个线程，退出时不等待未完成的连接"""
+    daemon_threads = True
+
+
+def main():
+    """
+    主函数：监听 Unix socket，直到被终止
+    """
+    socket_path = get_socket_path()
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    
+    # 清理上次异常退出遗留的 socket 文件
+    try:
+        os.unlink(socket_path)
+    except FileNotFoundError:
+        pass
+    
+    # systemd/launchd 通过 SIGTERM 停止服务，转为正常退出以便清理 socket 文件
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    if BATCH_WINDOW_MS > 0:
+        threading.Thread(target=_batch_worker, daemon=True).start()
+    
+    with HookServer(socket_path, HookRequestHandler) as server:
+        # 只允许当前用户连接
+        os.chmod(socket_path, 0o600)
+        print(f"CC-notifier daemon 已启动，监听 {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -112,6 +112,62 @@ def copy_to_clipboard(text):
         print(f"\n⚠️ 剪贴板操作失败: {e}")
         return False
 
+SYSTEMD_UNIT_TEMPLATE = """[Unit]
+Description=CC-Notifier daemon
+
+[Service]
+ExecStart={python} {daemon_path}
+Restart=on-failure
+
+[Install]
+WantedBy=default.target
+"""
+
+LAUNCHD_PLIST_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
+<plist version="1.0">
+<dict>
+    <key>Label</key>
+    <string>com.cc-notifier.daemon</string>
+    <key>ProgramArguments</key>
+    <array>
+        <string>{python}</string>
+        <string>{daemon_path}</string>
+    </array>
+    <key>RunAtLoad</key>
+    <true/>
+    <key>KeepAlive</key>
+    <true/>
+</dict>
+</plist>
+"""
+
+def install_daemon_service():
+    """安装并启动 daemon 用户服务（Linux: systemd，macOS: launchd）"""
+    daemon_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "cc_notifier_daemon.py"))
+    system = platform.system()
+    try:
+        if system == "Linux":
+            unit_path = Path.home() / ".config" / "systemd" / "user" / "cc-notifier.service"
+            unit_path.parent.mkdir(parents=True, exist_ok=True)
+            unit_path.write_text(SYSTEMD_UNIT_TEMPLATE.format(python=sys.executable, daemon_path=daemon_path))
+            subprocess.run(["systemctl", "--user", "daemon-reload"], check=True)
+            subprocess.run(["systemctl", "--user", "enable", "--now", "cc-notifier.service"], check=True)
+            print(f"✅ 已安装 systemd 用户服务: {unit_path}")
+        elif system == "Darwin":
+            plist_path = Path.home() / "Library" / "LaunchAgents" / "com.cc-notifier.daemon.plist"
+            plist_path.parent.mkdir(parents=True, exist_ok=True)
+            plist_path.write_text(LAUNCHD_PLIST_TEMPLATE.format(python=sys.executable, daemon_path=daemon_path))
+            subprocess.run(["launchctl", "load", "-w", str(plist_path)], check=True)
+            print(f"✅ 已安装 launchd 服务: {plist_path}")
+        else:
+            print(f"⚠️ 当前系统 ({system}) 不支持自动安装 daemon 服务")
+            return False
+        return True
+    except Exception as e:
+        print(f"❌ 安装 daemon 服务失败: {e}")
+        return False
+
 def verify_setup(config):
     """验证安装配置"""
     print("\n🔍 验证配置...")
@@ -250,6 +306,16 @@ def main():
     # 获取脚本的绝对路径
     notifier_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "cc_notifier.py"))
     
+    # 询问是否使用后台 daemon 模式
+    print("\n后台 daemon 模式：常驻进程复用配置和网络连接，hook 只需转发数据，响应更快")
+    use_daemon = get_input_with_default("是否安装后台 daemon 服务? (y/n)", "n")
+    if use_daemon.lower() in ['y', 'yes', '是']:
+        if not config_path:
+            print("⚠️  daemon 作为系统服务运行，读取不到 shell 中的环境变量，请确保已创建配置文件")
+        if install_daemon_service():
+            # hook 改为运行轻量客户端，daemon 未运行时客户端会回退为直接发送
+            notifier_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "cc_notifier_client.py"))
+    
     # 生成 hooks 配置
     hooks_config = {
         "hooks": {